@@ -0,0 +1,31 @@
+import argparse
+import glob
+import os
+import subprocess
+import sys
+import time
+
+# Runs every benchmark with parse.py --run and prints the best time
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PARSE = os.path.join(BENCH_DIR, "..", "parse.py")
+
+def run_bench(path, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, PARSE, "--run", "--source=" + path], capture_output=True, text=True)
+        elapsed = time.perf_counter() - start
+        if result.returncode != 0:
+            print(f"{os.path.basename(path)} failed with {result.returncode}: {result.stderr.strip()}", file=sys.stderr)
+            sys.exit(1)
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for path in sorted(glob.glob(os.path.join(BENCH_DIR, "*.sol25"))):
+        print(f"{os.path.basename(path):<24}{run_bench(path, args.repeat):.3f} s")
@@ -1,5 +1,7 @@
 import argparse
+import re
 import sys
+import threading
 
 import xml.dom.minidom as minidom
 import xml.etree.ElementTree as ET
@@ -18,6 +20,13 @@ class ParamMultiError(Exception):
     pass
 class MainRunError(Exception):
     pass
+# Errors of --run mode
+class DoesNotUnderstandError(Exception):
+    pass
+class RunOtherError(Exception):
+    pass
+class RunArgValueError(Exception):
+    pass
 
 
 # Parsing of command arguments
@@ -27,6 +36,8 @@ def print_help():
     print("python3 parse.py --help - for displaying help messsage")
     print('python3 parse.py --source="file" or python3 parse.py --source=file - for parsing a file containing SOL25 code')
     print(" or python3 parse.py - for parsing SOL25 code from stdin")
+    print("python3 parse.py --run [--source=file] - for running SOL25 code instead of printing XML tree")
+    print("python3 parse.py --types=file [--run] [--source=file] - also writes classes of receivers of sends to file")
     sys.exit(0)
 
 def file_path(args):
@@ -53,13 +64,15 @@ def arg_parser():
 
     parser = argparse.ArgumentParser()
     parser.add_argument("--source")
+    parser.add_argument("--run", action="store_true")
+    parser.add_argument("--types")
     args, unknown_args = parser.parse_known_args()
     if unknown_args:
         print(f"Unrecognized arguments: {unknown_args}", file=sys.stderr) 
         sys.exit(10)
    
     
-    return file_path(args)
+    return file_path(args), args
 
 # Class Visistor
 class Visitor_semantic_gen(Visitor):
@@ -622,11 +635,927 @@ class Visitor_semantic_gen(Visitor):
         final_output = final_output.rstrip("\n")
         print(final_output)
 
-if __name__ == "__main__":
-
-    #parse arguments
-    code = arg_parser()
-    grammar = r"""
+# Runtime objects for --run mode
+# every value is Sol_object, value keeps the builtin part (int, str, block closure), attrs are instance attributes
+class Sol_object:
+    __slots__ = ("cls", "value", "attrs")
+
+    def __init__(self, cls, value=None):
+        self.cls = cls
+        self.value = value
+        self.attrs = None
+
+class Sol_class:
+    def __init__(self, name, parent, base):
+        self.name = name
+        self.parent = parent
+        # builtin class from which the class is derived, decides what is in value
+        self.base = base
+        # own methods, selector -> python function(receiver, *args)
+        self.methods = {}
+        # methods including inherited ones, filled after compilation
+        self.table = None
+        self.meta = None
+        self.obj = None
+        # for class of class object, the class it creates
+        self.instance_cls = None
+
+# Variables of one method or block, slot 0 is the outer frame, slot 1 is self
+class Sol_scope:
+    def __init__(self, parent, params):
+        self.parent = parent
+        self.names = {}
+        self.size = 2
+        for param in params:
+            self.add(param)
+
+    def add(self, name):
+        self.names[name] = self.size
+        self.size += 1
+        return self.names[name]
+
+    # returns how many frames up the var is and its slot, unknown vars become locals
+    def lookup(self, name):
+        scope = self
+        depth = 0
+        while scope is not None:
+            if name in scope.names:
+                return depth, scope.names[name]
+            scope = scope.parent
+            depth += 1
+        return 0, self.add(name)
+
+# Compiles the validated lark tree into python closures and runs them
+class Engine_closure_gen:
+    # how many classes one send site remembers before it stops caching
+    poly_limit = 4
+    # limits for recursive compilation and running of the program, see deep_call
+    recursion_limit = 1000000
+    stack_size = 512 * 1024 * 1024
+
+    def __init__(self, visitor):
+        self.visitor = visitor
+        self.classes = {}
+        self.attr_methods = {}
+        self.max_block_arity = 0
+        self.receivers = {}
+        self.pending_binds = []
+
+        object_cls = self.new_class("Object", None, "Object")
+        for name in ["Nil", "True", "False", "Integer", "String", "Block"]:
+            self.new_class(name, object_cls, name)
+        self.int_cls = self.classes["Integer"]
+        self.str_cls = self.classes["String"]
+        self.block_cls = self.classes["Block"]
+        self.nil = Sol_object(self.classes["Nil"])
+        self.true = Sol_object(self.classes["True"], True)
+        self.false = Sol_object(self.classes["False"], False)
+
+        # implementations of builtin methods, only the ones listed in visitor tables get into the classes
+        self.primitives = {
+            "Object": {
+                "identicalTo:": lambda recv, arg: self.boolean(recv is arg),
+                "equalTo:": self.obj_equal,
+                "asString": self.obj_as_string,
+                "isNumber": lambda recv: self.boolean(type(recv.value) is int),
+                "isString": lambda recv: self.boolean(type(recv.value) is str),
+                "isBlock": lambda recv: self.boolean(recv.cls.base == "Block"),
+                "isNil": lambda recv: self.boolean(recv.cls.base == "Nil"),
+            },
+            "Nil": {"asString": self.obj_as_string},
+            "Integer": {
+                "equalTo:": self.obj_equal,
+                "greaterThan:": lambda recv, arg: self.boolean(recv.value > self.int_arg(arg)),
+                "plus:": lambda recv, arg: Sol_object(self.int_cls, recv.value + self.int_arg(arg)),
+                "minus:": lambda recv, arg: Sol_object(self.int_cls, recv.value - self.int_arg(arg)),
+                "multiplyBy:": lambda recv, arg: Sol_object(self.int_cls, recv.value * self.int_arg(arg)),
+                "divBy:": self.int_div,
+                "asString": self.obj_as_string,
+                "asInteger": lambda recv: recv,
+                "timesRepeat:": self.int_times_repeat,
+            },
+            "String": {
+                "print": self.str_print,
+                "equalTo:": self.obj_equal,
+                "asString": lambda recv: recv,
+                "asInteger": self.str_as_integer,
+                "concatenateWith:": self.str_concatenate,
+                "startsWith:endsBefore:": self.str_substring,
+            },
+            "Block": {
+                "whileTrue:": self.block_while_true,
+                "value:": self.block_value,
+            },
+            "True": {
+                "not": lambda recv: self.false,
+                "and:": lambda recv, arg: self.send(arg, "value"),
+                "or:": lambda recv, arg: self.true,
+                "ifTrue:ifFalse:": lambda recv, then, other: self.send(then, "value"),
+            },
+            "False": {
+                "not": lambda recv: self.true,
+                "and:": lambda recv, arg: self.false,
+                "or:": lambda recv, arg: self.send(arg, "value"),
+                "ifTrue:ifFalse:": lambda recv, then, other: self.send(other, "value"),
+            },
+        }
+        tables = {
+            "Object": visitor.object_methods,
+            "Nil": visitor.nil_methods,
+            "Integer": visitor.integer_methods,
+            "String": visitor.string_methods,
+            "Block": visitor.block_methods,
+            "True": visitor.true_false_methods,
+            "False": visitor.true_false_methods,
+        }
+        for name, selectors in tables.items():
+            for selector in selectors:
+                if selector in self.primitives[name]:
+                    self.classes[name].methods[selector] = self.primitives[name][selector]
+
+    def new_class(self, name, parent, base):
+        cls = Sol_class(name, parent, base)
+        # class object, receiver of new, from: and read
+        cls.meta = Sol_class(name + " class", None, "Class")
+        cls.meta.instance_cls = cls
+        cls.meta.methods["new"] = lambda recv: self.instantiate(recv.value)
+        cls.meta.methods["from:"] = self.class_from
+        if base == "String" and "read" in self.visitor.string_methods:
+            cls.meta.methods["read"] = self.class_read
+        cls.obj = Sol_object(cls.meta, cls)
+        self.classes[name] = cls
+        return cls
+
+    # Helpers used by builtin methods
+    def boolean(self, value):
+        return self.true if value else self.false
+
+    def is_true(self, obj):
+        return obj is self.true or obj.cls.base == "True"
+
+    def int_arg(self, arg):
+        if type(arg.value) is not int:
+            raise RunArgValueError(f"Argument has to be an Integer.")
+        return arg.value
+
+    def send(self, recv, selector, *args):
+        return self.lookup(recv.cls, selector)(recv, *args)
+
+    def instantiate(self, cls):
+        if cls is self.classes["Nil"]:
+            return self.nil
+        if cls is self.classes["True"]:
+            return self.true
+        if cls is self.classes["False"]:
+            return self.false
+        defaults = {"Integer": 0, "String": "", "True": True, "False": False}
+        if cls.base == "Block":
+            return Sol_object(cls, self.empty_block())
+        return Sol_object(cls, defaults.get(cls.base))
+
+    # block of Block new, takes no arguments and returns nil
+    def empty_block(self):
+        nil = self.nil
+
+        def run_block():
+            return nil
+        run_block.arity = 0
+        return run_block
+
+    # Builtin methods
+    def obj_equal(self, recv, arg):
+        if recv is arg:
+            return self.true
+        return self.boolean(recv.value is not None and type(recv.value) is type(arg.value) and recv.value == arg.value)
+
+    def obj_as_string(self, recv):
+        names = {"Nil": "nil", "True": "true", "False": "false"}
+        if type(recv.value) is int or type(recv.value) is str:
+            return Sol_object(self.str_cls, str(recv.value))
+        return Sol_object(self.str_cls, names.get(recv.cls.base, ""))
+
+    def int_div(self, recv, arg):
+        if self.int_arg(arg) == 0:
+            raise RunArgValueError(f"Division by zero.")
+        return Sol_object(self.int_cls, recv.value // arg.value)
+
+    def int_times_repeat(self, recv, block):
+        # the block is looked up once for the whole loop
+        body = self.lookup(block.cls, "value:")
+        for index in range(1, recv.value + 1):
+            body(block, Sol_object(self.int_cls, index))
+        return self.nil
+
+    def str_print(self, recv):
+        sys.stdout.write(recv.value)
+        return recv
+
+    def str_as_integer(self, recv):
+        # only what is an INT literal in SOL25, python int() takes more
+        if re.fullmatch(r"-?\d+", recv.value) is None:
+            return self.nil
+        return Sol_object(self.int_cls, int(recv.value))
+
+    def str_concatenate(self, recv, arg):
+        if type(arg.value) is not str:
+            return self.nil
+        return Sol_object(self.str_cls, recv.value + arg.value)
+
+    def str_substring(self, recv, start, end):
+        if type(start.value) is not int or type(end.value) is not int or start.value < 1 or end.value < 1:
+            return self.nil
+        return Sol_object(self.str_cls, recv.value[start.value - 1:end.value - 1])
+
+    def block_value(self, recv, *args):
+        if recv.value.arity != len(args):
+            raise DoesNotUnderstandError(f"Block does not take {len(args)} arguments.")
+        return recv.value(*args)
+
+    def block_while_true(self, recv, body):
+        condition = self.lookup(recv.cls, "value")
+        step = self.lookup(body.cls, "value")
+        while self.is_true(condition(recv)):
+            step(body)
+        return self.nil
+
+    def class_from(self, recv, arg):
+        cls = recv.value
+        if cls.base != "Object" and cls.base != arg.cls.base:
+            raise RunArgValueError(f"Cannot create {cls.name} from {arg.cls.name}.")
+        obj = Sol_object(cls, arg.value)
+        if arg.attrs is not None:
+            obj.attrs = dict(arg.attrs)
+        return obj
+
+    def class_read(self, recv):
+        return Sol_object(recv.value, sys.stdin.readline().rstrip("\n"))
+
+    # Dispatch, selector missing in the table is instance attribute
+    def lookup(self, cls, selector):
+        method = cls.table.get(selector)
+        if method is not None:
+            return method
+        if selector in self.attr_methods:
+            return self.attr_methods[selector]
+        if ":" not in selector:
+            def get_attr(recv):
+                if recv.attrs is None or selector not in recv.attrs:
+                    raise DoesNotUnderstandError(f"{recv.cls.name} does not understand {selector}")
+                return recv.attrs[selector]
+            method = get_attr
+        elif selector.count(":") == 1:
+            name = selector[:-1]
+            def set_attr(recv, arg):
+                if recv.attrs is None:
+                    recv.attrs = {}
+                recv.attrs[name] = arg
+                return recv
+            method = set_attr
+        else:
+            raise DoesNotUnderstandError(f"{cls.name} does not understand {selector}")
+        self.attr_methods[selector] = method
+        return method
+
+    def build_table(self, cls):
+        if cls.table is None:
+            cls.table = dict(self.build_table(cls.parent)) if cls.parent is not None else {}
+            cls.table.update(cls.methods)
+        return cls.table
+
+    # Classes, selectors of user methods and dispatch tables, bodies are compiled later in compile
+    def define(self, tree):
+        class_defs = {class_tree.children[0].value: class_tree for class_tree in tree.children}
+        defining = set()
+
+        def define_class(name):
+            if name in self.classes:
+                return self.classes[name]
+            if name in defining:
+                raise RunOtherError(f"Cyclic inheritance of class {name}.")
+            defining.add(name)
+            parent = define_class(class_defs[name].children[1].value)
+            return self.new_class(name, parent, parent.base)
+
+        for name in class_defs:
+            define_class(name)
+        for name, class_tree in class_defs.items():
+            for method_tree in class_tree.children[2:]:
+                # the method tree stays in the table until the body is compiled
+                self.classes[name].methods[self.selector_name(method_tree.children[0])] = method_tree
+
+        # value, value:, value:value: ... up to the biggest block in the program
+        for base_tree in tree.find_data("expr_base"):
+            if isinstance(base_tree.children[0], Tree) and base_tree.children[0].data == "method_body":
+                arity = len([child for child in base_tree.children[0].children if isinstance(child, Tree) and child.data == "block_param"])
+                self.max_block_arity = max(self.max_block_arity, arity)
+        for arity in range(self.max_block_arity + 1):
+            selector = "value" if arity == 0 else "value:" * arity
+            self.block_cls.methods.setdefault(selector, self.block_value)
+        for cls in self.classes.values():
+            self.build_table(cls)
+            self.build_table(cls.meta)
+
+    # Compilation of the lark tree, receivers are classes of sends found by Type_inference_pass
+    def compile(self, tree, receivers=None):
+        self.receivers = receivers if receivers is not None else {}
+        self.pending_binds = []
+        self.deep_call(self.compile_methods, tree)
+
+        # tables still point to method trees, build them again
+        for cls in self.classes.values():
+            cls.table = None
+        for cls in self.classes.values():
+            self.build_table(cls)
+
+        # sends with one possible receiver class get the method directly
+        for cls, selector, bind in self.pending_binds:
+            try:
+                bind(self.lookup(cls, selector))
+            except DoesNotUnderstandError as e:
+                bind(self.raise_error(e))
+
+    def compile_methods(self, tree):
+        for class_tree in tree.children:
+            cls = self.classes[class_tree.children[0].value]
+            for method_tree in class_tree.children[2:]:
+                selector = self.selector_name(method_tree.children[0])
+                cls.methods[selector] = self.compile_method(cls, method_tree.children[1])
+
+    def raise_error(self, error):
+        def raise_on_call(*args):
+            raise error
+        return raise_on_call
+
+    def selector_name(self, sel_tree):
+        # same as in visitor, compute:and:and:
+        selector = ""
+        for child in sel_tree.children:
+            if isinstance(child, Tree):
+                for child_tree in child.children:
+                    selector += child_tree.value
+            else:
+                selector += child.value
+        return selector
+
+    def compile_body(self, body_tree, outer, cls):
+        params = [child.children[0].value[1:] for child in body_tree.children if isinstance(child, Tree) and child.data == "block_param"]
+        stat = [child for child in body_tree.children if isinstance(child, Tree) and child.data == "block_stat"][0]
+        scope = Sol_scope(outer, params)
+        stmts = [self.compile_assign(assign, scope, cls) for assign in stat.children]
+        padding = [self.nil] * (scope.size - 2 - len(params))
+        return len(params), stmts, padding
+
+    def compile_method(self, cls, body_tree):
+        arity, stmts, padding = self.compile_body(body_tree, None, cls)
+        nil = self.nil
+
+        def run_method(recv, *args):
+            frame = [None, recv, *args, *padding]
+            result = nil
+            for stmt in stmts:
+                result = stmt(frame)
+            return result
+        return run_method
+
+    def compile_block(self, body_tree, scope, cls):
+        arity, stmts, padding = self.compile_body(body_tree, scope, cls)
+        nil = self.nil
+        block_cls = self.block_cls
+
+        def make_block(frame):
+            def run_block(*args):
+                inner = [frame, frame[1], *args, *padding]
+                result = nil
+                for stmt in stmts:
+                    result = stmt(inner)
+                return result
+            run_block.arity = arity
+            return Sol_object(block_cls, run_block)
+        return make_block
+
+    def compile_assign(self, tree, scope, cls):
+        depth, slot = scope.lookup(tree.children[0].value)
+        value = self.compile_expr(tree.children[1], scope, cls)
+        if depth == 0:
+            def assign(frame):
+                frame[slot] = result = value(frame)
+                return result
+        else:
+            def assign(frame):
+                result = value(frame)
+                target = frame
+                for _ in range(depth):
+                    target = target[0]
+                target[slot] = result
+                return result
+        return assign
+
+    def compile_expr(self, tree, scope, cls):
+        base_tree, tail = tree.children
+        recv = self.compile_base(base_tree, scope, cls)
+        message = tail.children[0]
+        if not isinstance(message, Tree):
+            selector, args = message.value, []
+        else:
+            selector, args = "", []
+            while message.children:
+                selector += message.children[0].value
+                args.append(self.compile_base(message.children[1], scope, cls))
+                message = message.children[2]
+            if not args:
+                return recv
+        token = base_tree.children[0]
+        if not isinstance(token, Tree) and token.type == "ID" and token.value == "super":
+            # super is bound statically
+            return self.compile_bound_send(recv, selector, args, cls.parent)
+        classes = self.receivers.get(id(tree))
+        if classes is not None and len(classes) == 1:
+            return self.compile_bound_send(recv, selector, args, next(iter(classes)))
+        return self.compile_send(recv, selector, args)
+
+    def compile_base(self, tree, scope, cls):
+        child = tree.children[0]
+        if isinstance(child, Tree):
+            if child.data == "expr":
+                return self.compile_expr(child, scope, cls)
+            return self.compile_block(child, scope, cls)
+        if child.type == "INT":
+            const = Sol_object(self.int_cls, int(child.value))
+        elif child.type == "STRING":
+            escapes = {"n": "\n", "\\": "\\", "'": "'"}
+            const = Sol_object(self.str_cls, re.sub(r"\\(.)", lambda match: escapes[match.group(1)], child.value[1:-1]))
+        elif child.type == "CLASS_ID":
+            const = self.classes[child.value].obj
+        elif child.value in ["nil", "true", "false"]:
+            const = {"nil": self.nil, "true": self.true, "false": self.false}[child.value]
+        elif child.value == "self" or child.value == "super":
+            return lambda frame: frame[1]
+        else:
+            depth, slot = scope.lookup(child.value)
+            if depth == 0:
+                return lambda frame: frame[slot]
+            if depth == 1:
+                return lambda frame: frame[0][slot]
+
+            def read(frame):
+                for _ in range(depth):
+                    frame = frame[0]
+                return frame[slot]
+            return read
+        return lambda frame: const
+
+    # Send site with inline cache, first class is kept in cache_cls,
+    # next ones up to poly_limit in poly, others go through the dispatch table
+    def compile_send(self, recv, selector, args):
+        lookup = self.lookup
+        poly_limit = self.poly_limit
+        cache_cls = None
+        cache_method = None
+        poly = {}
+
+        def dispatch(cls):
+            nonlocal cache_cls, cache_method
+            method = poly.get(cls)
+            if method is None:
+                method = lookup(cls, selector)
+                if cache_cls is None:
+                    cache_cls, cache_method = cls, method
+                elif len(poly) < poly_limit:
+                    poly[cls] = method
+            return method
+
+        if not args:
+            def send(frame):
+                obj = recv(frame)
+                if obj.cls is cache_cls:
+                    return cache_method(obj)
+                return dispatch(obj.cls)(obj)
+        elif len(args) == 1:
+            arg = args[0]
+
+            def send(frame):
+                obj = recv(frame)
+                value = arg(frame)
+                if obj.cls is cache_cls:
+                    return cache_method(obj, value)
+                return dispatch(obj.cls)(obj, value)
+        else:
+            def send(frame):
+                obj = recv(frame)
+                values = [arg(frame) for arg in args]
+                if obj.cls is cache_cls:
+                    return cache_method(obj, *values)
+                return dispatch(obj.cls)(obj, *values)
+        return send
+
+    # Send site without lookup, the method is bound in compile once the tables are complete
+    def compile_bound_send(self, recv, selector, args, cls):
+        method = None
+
+        def bind(resolved):
+            nonlocal method
+            method = resolved
+        self.pending_binds.append((cls, selector, bind))
+
+        if not args:
+            def send(frame):
+                return method(recv(frame))
+        elif len(args) == 1:
+            arg = args[0]
+
+            def send(frame):
+                return method(recv(frame), arg(frame))
+        else:
+            def send(frame):
+                return method(recv(frame), *[arg(frame) for arg in args])
+        return send
+
+    # every send takes several python frames and deeply nested expressions compile recursively,
+    # so both go through a thread with bigger stack
+    def deep_call(self, function, *args):
+        errors = []
+
+        def call():
+            try:
+                function(*args)
+            except RecursionError:
+                errors.append(RunOtherError(f"Maximum recursion depth exceeded."))
+            except Exception as e:
+                errors.append(e)
+
+        old_limit = sys.getrecursionlimit()
+        old_stack_size = threading.stack_size(self.stack_size)
+        sys.setrecursionlimit(self.recursion_limit)
+        try:
+            thread = threading.Thread(target=call)
+            thread.start()
+            thread.join()
+        finally:
+            threading.stack_size(old_stack_size)
+            sys.setrecursionlimit(old_limit)
+        if errors:
+            raise errors[0]
+
+    def run(self):
+        main = self.classes["Main"]
+        try:
+            self.deep_call(lambda: self.lookup(main, "run")(self.instantiate(main)))
+        finally:
+            sys.stdout.flush()
+
+# Variable of one method for Type_inference_pass
+class Sol_var:
+    def __init__(self, name):
+        self.name = name
+        # abstract expressions of everything assigned to the var
+        self.values = []
+        self.assigned = False
+        # var can be read before the first assign, so it can be nil
+        self.maybe_nil = False
+
+# Finds possible receiver classes of sends, flow insensitive over whole method,
+# types are frozensets of Sol_class, None means unknown
+class Type_inference_pass:
+    # how many times vars depending on each other are evaluated, keeps the pass linear
+    rounds = 4
+
+    def __init__(self, engine):
+        self.engine = engine
+        # id of expr tree with send -> possible classes of receiver
+        self.receivers = {}
+        self.index = ET.Element("types")
+        self.sends = 0
+        self.monomorphic = 0
+
+        classes = engine.classes
+        # self can be the class or any of its subclasses
+        self.self_types = {cls: {cls} for cls in classes.values()}
+        for cls in classes.values():
+            parent = cls.parent
+            while parent is not None:
+                self.self_types[parent].add(cls)
+                parent = parent.parent
+        self.self_types = {cls: frozenset(types) for cls, types in self.self_types.items()}
+
+        booleans = frozenset([classes["True"], classes["False"]])
+        integers = frozenset([classes["Integer"]])
+        strings = frozenset([classes["String"]])
+        nil = frozenset([classes["Nil"]])
+        # results of builtin methods, key is class which defines the method
+        self.results = {
+            ("Object", "identicalTo:"): lambda cls: booleans,
+            ("Object", "equalTo:"): lambda cls: booleans,
+            ("Object", "asString"): lambda cls: strings,
+            ("Object", "isNumber"): lambda cls: booleans,
+            ("Object", "isString"): lambda cls: booleans,
+            ("Object", "isBlock"): lambda cls: booleans,
+            ("Object", "isNil"): lambda cls: booleans,
+            ("Nil", "asString"): lambda cls: strings,
+            ("Integer", "equalTo:"): lambda cls: booleans,
+            ("Integer", "greaterThan:"): lambda cls: booleans,
+            ("Integer", "plus:"): lambda cls: integers,
+            ("Integer", "minus:"): lambda cls: integers,
+            ("Integer", "multiplyBy:"): lambda cls: integers,
+            ("Integer", "divBy:"): lambda cls: integers,
+            ("Integer", "asString"): lambda cls: strings,
+            ("Integer", "asInteger"): lambda cls: frozenset([cls]),
+            ("Integer", "timesRepeat:"): lambda cls: nil,
+            ("String", "print"): lambda cls: frozenset([cls]),
+            ("String", "equalTo:"): lambda cls: booleans,
+            ("String", "asString"): lambda cls: frozenset([cls]),
+            ("String", "asInteger"): lambda cls: integers | nil,
+            ("String", "concatenateWith:"): lambda cls: strings | nil,
+            ("String", "startsWith:endsBefore:"): lambda cls: strings | nil,
+            ("Block", "whileTrue:"): lambda cls: nil,
+            ("True", "not"): lambda cls: frozenset([classes["False"]]),
+            ("True", "or:"): lambda cls: frozenset([classes["True"]]),
+            ("False", "not"): lambda cls: frozenset([classes["True"]]),
+            ("False", "and:"): lambda cls: frozenset([classes["False"]]),
+            ("Class", "new"): lambda cls: frozenset([cls.instance_cls]),
+            ("Class", "from:"): lambda cls: frozenset([cls.instance_cls]),
+            ("Class", "read"): lambda cls: frozenset([cls.instance_cls]),
+        }
+
+    # the walk recurses once per nesting level, so it runs like compile in the thread with bigger stack
+    def infer(self, tree):
+        self.engine.deep_call(self.infer_methods, tree)
+        self.index.set("sends", str(self.sends))
+        self.index.set("monomorphic", str(self.monomorphic))
+
+    def infer_methods(self, tree):
+        for class_tree in tree.children:
+            cls = self.engine.classes[class_tree.children[0].value]
+            for method_tree in class_tree.children[2:]:
+                selector = self.engine.selector_name(method_tree.children[0])
+                self.infer_method(cls, selector, method_tree.children[1])
+
+    def infer_method(self, cls, selector, body_tree):
+        self.vars = {}
+        self.sites = []
+        self.walk_body(body_tree, None, cls)
+
+        # vars depend on vars used as receivers in what is assigned to them
+        deps = {key: set() for key in self.vars}
+        for key, var in self.vars.items():
+            for value in var.values:
+                self.collect_vars(value, deps[key])
+
+        # components come dependencies first, cycle is evaluated at most rounds times, if it does not settle it is unknown
+        types = {}
+        for component in self.components(deps):
+            if len(component) == 1 and component[0] not in deps[component[0]]:
+                types[component[0]] = self.var_type(self.vars[component[0]], types)
+                continue
+            for key in component:
+                types[key] = frozenset()
+            for _ in range(self.rounds):
+                changed = False
+                for key in component:
+                    classes = self.var_type(self.vars[key], types)
+                    if classes != types[key]:
+                        types[key] = classes
+                        changed = True
+                if not changed:
+                    break
+            else:
+                for key in component:
+                    types[key] = None
+
+        method_el = ET.SubElement(self.index, "method", attrib={"class": cls.name, "selector": selector})
+        for key, var in self.vars.items():
+            self.add_classes(ET.SubElement(method_el, "var", name=var.name), types[key])
+        # inner sends are before outer ones, so each site only adds its own send to the known receiver
+        known = {}
+        for tree, recv, token, bound in self.sites:
+            classes = frozenset([bound]) if bound is not None else self.evaluate(recv, types, known)
+            self.receivers[id(tree)] = classes
+            self.sends += 1
+            if classes is not None and len(classes) == 1:
+                self.monomorphic += 1
+            send_el = ET.SubElement(method_el, "send", selector=self.site_selector(tree), line=str(token.line), column=str(token.column))
+            self.add_classes(send_el, classes)
+            if bound is not None:
+                send_el.set("super", "true")
+
+    # Index without classes when the program cannot be defined or the pass fails, every send is unknown
+    def infer_unknown(self, tree):
+        for class_tree in tree.children:
+            for method_tree in class_tree.children[2:]:
+                selector = self.engine.selector_name(method_tree.children[0])
+                method_el = ET.SubElement(self.index, "method", attrib={"class": class_tree.children[0].value, "selector": selector})
+                for expr_tree in self.send_trees(method_tree.children[1]):
+                    message = expr_tree.children[1].children[0]
+                    token = message if not isinstance(message, Tree) else message.children[0]
+                    ET.SubElement(method_el, "send", selector=self.site_selector(expr_tree), line=str(token.line), column=str(token.column))
+                    self.sends += 1
+        self.index.set("sends", str(self.sends))
+        self.index.set("monomorphic", str(self.monomorphic))
+
+    # expr trees with a send in the same order as walk_expr finds them, without recursion
+    def send_trees(self, body_tree):
+        found = []
+        stack = [(body_tree, False)]
+        while stack:
+            tree, visited = stack.pop()
+            if visited:
+                found.append(tree)
+                continue
+            if tree.data == "expr":
+                message = tree.children[1].children[0]
+                if not isinstance(message, Tree) or message.children:
+                    stack.append((tree, True))
+            stack.extend((child, False) for child in reversed(tree.children) if isinstance(child, Tree))
+        return found
+
+    def add_classes(self, element, classes):
+        # unknown classes have no attribute
+        if classes is not None:
+            element.set("classes", " ".join(sorted(cls.name for cls in classes)))
+
+    def site_selector(self, tree):
+        message = tree.children[1].children[0]
+        if not isinstance(message, Tree):
+            return message.value
+        selector = ""
+        while message.children:
+            selector += message.children[0].value
+            message = message.children[2]
+        return selector
+
+    # Walk through the tree in the same order as Engine_closure_gen, so the vars are in the same scopes
+    def walk_body(self, body_tree, outer, cls):
+        params = [child.children[0].value[1:] for child in body_tree.children if isinstance(child, Tree) and child.data == "block_param"]
+        stat = [child for child in body_tree.children if isinstance(child, Tree) and child.data == "block_stat"][0]
+        scope = Sol_scope(outer, params)
+        for param in params:
+            key, var = self.var(scope, param)
+            var.values.append(("const", None))
+            var.assigned = True
+        for assign in stat.children:
+            key, var = self.var(scope, assign.children[0].value)
+            var.values.append(self.walk_expr(assign.children[1], scope, cls))
+            var.assigned = True
+
+    # var is identified by the scope where it is defined and its slot
+    def var(self, scope, name):
+        depth, slot = scope.lookup(name)
+        while depth:
+            scope = scope.parent
+            depth -= 1
+        return (scope, slot), self.vars.setdefault((scope, slot), Sol_var(name))
+
+    def walk_expr(self, tree, scope, cls):
+        base_tree, tail = tree.children
+        recv = self.walk_base(base_tree, scope, cls)
+        message = tail.children[0]
+        if not isinstance(message, Tree):
+            token = message
+        else:
+            if not message.children:
+                return recv
+            token = message.children[0]
+            while message.children:
+                self.walk_base(message.children[1], scope, cls)
+                message = message.children[2]
+        base = base_tree.children[0]
+        if not isinstance(base, Tree) and base.type == "ID" and base.value == "super":
+            self.sites.append((tree, recv, token, cls.parent))
+            return ("const", None)
+        self.sites.append((tree, recv, token, None))
+        return ("send", recv, self.site_selector(tree))
+
+    def walk_base(self, tree, scope, cls):
+        child = tree.children[0]
+        classes = self.engine.classes
+        if isinstance(child, Tree):
+            if child.data == "expr":
+                return self.walk_expr(child, scope, cls)
+            self.walk_body(child, scope, cls)
+            return ("const", frozenset([classes["Block"]]))
+        if child.type == "INT":
+            return ("const", frozenset([classes["Integer"]]))
+        if child.type == "STRING":
+            return ("const", frozenset([classes["String"]]))
+        if child.type == "CLASS_ID":
+            return ("const", frozenset([classes[child.value].meta]))
+        if child.value in ["nil", "true", "false"]:
+            return ("const", frozenset([classes[child.value.capitalize()]]))
+        if child.value == "self" or child.value == "super":
+            return ("const", self.self_types[cls])
+        key, var = self.var(scope, child.value)
+        if not var.assigned:
+            var.maybe_nil = True
+        return ("var", key)
+
+    def collect_vars(self, value, found):
+        while value[0] == "send":
+            value = value[1]
+        if value[0] == "var":
+            found.add(value[1])
+
+    def var_type(self, var, types):
+        result = frozenset([self.engine.classes["Nil"]]) if var.maybe_nil else frozenset()
+        for value in var.values:
+            classes = self.evaluate(value, types)
+            if classes is None:
+                return None
+            result |= classes
+        return result
+
+    # known maps id of send value -> classes, the chain of sends is followed only down to the first known one
+    def evaluate(self, value, types, known=None):
+        chain = []
+        while value[0] == "send" and (known is None or id(value) not in known):
+            chain.append(value)
+            value = value[1]
+        if value[0] == "const":
+            classes = value[1]
+        elif value[0] == "var":
+            classes = types[value[1]]
+        else:
+            classes = known[id(value)]
+        for send in reversed(chain):
+            classes = self.send_result(classes, send[2])
+            if known is not None:
+                known[id(send)] = classes
+        return classes
+
+    def send_result(self, recv, selector):
+        if recv is None:
+            return None
+        result = frozenset()
+        for cls in recv:
+            classes = self.result(cls, selector)
+            if classes is None:
+                return None
+            result |= classes
+        return result
+
+    # What the send returns, same lookup as Engine_closure_gen.lookup
+    def result(self, cls, selector):
+        owner = cls
+        while owner is not None and selector not in owner.methods:
+            owner = owner.parent
+        if owner is None:
+            if ":" not in selector:
+                return None
+            if selector.count(":") == 1:
+                return frozenset([cls])
+            return frozenset()
+        # user methods are not followed
+        if isinstance(owner.methods[selector], Tree):
+            return None
+        rule = self.results.get((owner.base if owner.base == "Class" else owner.name, selector))
+        return rule(cls) if rule is not None else None
+
+    # Tarjan's strongly connected components, without recursion
+    def components(self, deps):
+        index = {}
+        low = {}
+        stack = []
+        on_stack = set()
+        result = []
+        for root in deps:
+            if root in index:
+                continue
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(deps[root]))]
+            while work:
+                node, edges = work[-1]
+                for dep in edges:
+                    if dep not in index:
+                        index[dep] = low[dep] = len(index)
+                        stack.append(dep)
+                        on_stack.add(dep)
+                        work.append((dep, iter(deps[dep])))
+                        break
+                    if dep in on_stack:
+                        low[node] = min(low[node], index[dep])
+                else:
+                    work.pop()
+                    if work:
+                        low[work[-1][0]] = min(low[work[-1][0]], low[node])
+                    if low[node] == index[node]:
+                        component = []
+                        while True:
+                            key = stack.pop()
+                            on_stack.discard(key)
+                            component.append(key)
+                            if key == node:
+                                break
+                        result.append(component)
+        return result
+
+    # Writes the sidecar index, same formatting as the xml tree
+    def write_index(self, path):
+        raw_xml = ET.tostring(self.index, encoding="unicode", method="xml")
+        final_output = minidom.parseString(raw_xml).toprettyxml(indent="  ", encoding="utf-8").decode("utf-8")
+        with open(path, "w") as file:
+            file.write(final_output)
+
+grammar = r"""
         program: class_def*
         class_def: "class" CLASS_ID ":" CLASS_ID "{" method_def* "}"
         method_def: sel "[" method_body "]"
@@ -653,20 +1582,29 @@ if __name__ == "__main__":
         %import common.WS
         %ignore WS
         %ignore COMMENT
-    """
+"""
+
+# Lark parser of SOL25, first comment of the program is stored in first_comment[0]
+def sol_parser(first_comment):
     # Lexer callback to get the first comment
     def lexer_callback(token):
         if first_comment[0] is None:
             first_comment[0] = token.value
 
-    first_comment = [None]
-    parser = Lark(
+    return Lark(
         grammar,
         start="program",
         lexer="contextual",
         parser	= "lalr",
         lexer_callbacks={"COMMENT": lexer_callback}  
     )
+
+if __name__ == "__main__":
+
+    #parse arguments
+    code, args = arg_parser()
+    first_comment = [None]
+    parser = sol_parser(first_comment)
    
     try:
         tree = parser.parse(code)
@@ -674,7 +1612,32 @@ if __name__ == "__main__":
             visitor = Visitor_semantic_gen(first_comment[0])
             visitor.visit_topdown(tree)
 
-            visitor.format_print_xml_tree()
+            if args.run or args.types is not None:
+                engine = Engine_closure_gen(visitor)
+                inference = None
+                try:
+                    engine.define(tree)
+                    inference = Type_inference_pass(engine)
+                    inference.infer(tree)
+                except Exception:
+                    # cyclic inheritance or any failure of the pass only matters when running,
+                    # XML mode keeps its output and exit code, the index has every send unknown
+                    if args.run:
+                        raise
+                    print(f"Receiver classes could not be inferred, every send is unknown", file=sys.stderr)
+                    inference = Type_inference_pass(engine)
+                    inference.infer_unknown(tree)
+                if args.types is not None:
+                    try:
+                        inference.write_index(args.types)
+                    except OSError:
+                        print(f"Couldnt write the types file", file=sys.stderr)
+                        sys.exit(12)
+            if args.run:
+                engine.compile(tree, inference.receivers)
+                engine.run()
+            else:
+                visitor.format_print_xml_tree()
         except MainRunError as e:
             print(f"No main or main with method run",file=sys.stderr)
             sys.exit(31)
@@ -696,6 +1659,15 @@ if __name__ == "__main__":
         except ParamMultiError as e:
             print(f"Semantic Error: {e}",file=sys.stderr)
             sys.exit(35)
+        except DoesNotUnderstandError as e:
+            print(f"Runtime Error: {e}",file=sys.stderr)
+            sys.exit(51)
+        except RunOtherError as e:
+            print(f"Runtime Error: {e}",file=sys.stderr)
+            sys.exit(52)
+        except RunArgValueError as e:
+            print(f"Runtime Error: {e}",file=sys.stderr)
+            sys.exit(53)
 
     except UnexpectedToken as e:
         print(f"Syntax Error", file=sys.stderr)
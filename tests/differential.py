@@ -0,0 +1,189 @@
+import argparse
+import contextlib
+import glob
+import io
+import os
+import runpy
+import sys
+
+import sol25_gen
+
+# Differential runner, runs parse.py in process and compares stdout and exit code
+# against golden files or against another (reference) parse.py
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TESTS_DIR)
+PARSE = os.path.join(ROOT_DIR, "parse.py")
+CORPUS_DIR = os.path.join(TESTS_DIR, "corpus")
+# corpus -> arguments of parse.py
+CORPORA = {"valid": [], "invalid": [], "run": ["--run"]}
+
+
+def run_parse(parse_path, args, stdin=""):
+    # same as running python3 parse.py args, returns exit code and stdout
+    out = io.StringIO()
+    old_argv, old_stdin = sys.argv, sys.stdin
+    sys.argv = [parse_path] + args
+    sys.stdin = io.StringIO(stdin)
+    code = 0
+    try:
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(io.StringIO()):
+            runpy.run_path(parse_path, run_name="__main__")
+    except SystemExit as e:
+        code = e.code if e.code is not None else 0
+    finally:
+        sys.argv, sys.stdin = old_argv, old_stdin
+    return code, out.getvalue()
+
+
+# Lark parser is built once for in process helpers below
+_parser = None
+_first_comment = [None]
+
+
+def load_parse():
+    global _parser
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+    import parse
+    if _parser is None:
+        _parser = parse.sol_parser(_first_comment)
+    return parse
+
+
+def analyze(source):
+    # lark tree and visitor after semantic checks, like parse.py does before printing
+    parse = load_parse()
+    _first_comment[0] = None
+    tree = _parser.parse(source)
+    visitor = parse.Visitor_semantic_gen(_first_comment[0])
+    visitor.visit_topdown(tree)
+    return tree, visitor
+
+
+def execute(tree, visitor, bind=True):
+    # runs the program, bind=False leaves every send to the inline caches
+    parse = load_parse()
+    out = io.StringIO()
+    error = None
+    old_stdin = sys.stdin
+    sys.stdin = io.StringIO("")
+    try:
+        with contextlib.redirect_stdout(out):
+            engine = parse.Engine_closure_gen(visitor)
+            engine.define(tree)
+            receivers = None
+            if bind:
+                inference = parse.Type_inference_pass(engine)
+                inference.infer(tree)
+                receivers = inference.receivers
+            engine.compile(tree, receivers)
+            engine.run()
+    except (parse.DoesNotUnderstandError, parse.RunOtherError, parse.RunArgValueError) as e:
+        error = type(e).__name__
+    finally:
+        sys.stdin = old_stdin
+    return error, out.getvalue()
+
+
+def accepts(parse_path, args):
+    # older parse.py exits 10 on arguments it does not know, before it looks for the source
+    if not args:
+        return True
+    return run_parse(parse_path, args + ["--source=" + os.path.join(CORPUS_DIR, "missing.sol25")])[0] != 10
+
+
+def corpus_files(name):
+    return sorted(glob.glob(os.path.join(CORPUS_DIR, name, "*.sol25")))
+
+
+def golden_paths(source_path):
+    base = os.path.splitext(source_path)[0]
+    return base + ".out", base + ".code"
+
+
+def read_golden(source_path):
+    out_path, code_path = golden_paths(source_path)
+    with open(out_path, "r", newline="") as file:
+        out = file.read()
+    with open(code_path, "r") as file:
+        code = int(file.read())
+    return code, out
+
+
+def write_golden(source_path, result):
+    out_path, code_path = golden_paths(source_path)
+    with open(out_path, "w", newline="") as file:
+        file.write(result[1])
+    with open(code_path, "w") as file:
+        file.write(str(result[0]) + "\n")
+
+
+def compare(reference, candidate, cases):
+    # reference and candidate are functions case -> (exit code, stdout), returns cases which differ
+    mismatches = []
+    for case in cases:
+        expected = reference(case)
+        actual = candidate(case)
+        if expected != actual:
+            mismatches.append((case, expected, actual))
+    return mismatches
+
+
+def report(mismatches, label):
+    for case, expected, actual in mismatches:
+        name = case if len(case) < 60 else case.splitlines()[0] + " ..."
+        print(f"{label}: {name}", file=sys.stderr)
+        print(f"  expected exit code {expected[0]}, got {actual[0]}", file=sys.stderr)
+        if expected[1] != actual[1]:
+            print(f"  stdout differs", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compares parse.py against golden files or a reference parse.py")
+    parser.add_argument("--candidate", default=PARSE)
+    parser.add_argument("--reference", help="reference parse.py, golden files are used when missing")
+    parser.add_argument("--args", default="", help="extra arguments of the candidate, e.g. --types=/tmp/types.xml")
+    parser.add_argument("--random", type=int, default=0, help="number of random programs, needs --reference")
+    parser.add_argument("--random-args", default="", help="arguments of both for random programs, e.g. --run")
+    parser.add_argument("--seed", type=int, default=25)
+    parser.add_argument("--write-golden", action="store_true", help="store output of the candidate as golden files")
+    args = parser.parse_args()
+    extra = args.args.split()
+    random_args = args.random_args.split()
+
+    failed = False
+    for name, mode_args in CORPORA.items():
+        files = corpus_files(name)
+        if args.write_golden:
+            for path in files:
+                write_golden(path, run_parse(args.candidate, mode_args + ["--source=" + path]))
+            continue
+        if args.reference is None:
+            reference = read_golden
+        elif not accepts(args.reference, mode_args):
+            # e.g. --run against a reference from before the mode existed
+            print(f"{name}: skipped, reference does not accept {' '.join(mode_args)}")
+            continue
+        else:
+            reference = lambda path: run_parse(args.reference, mode_args + ["--source=" + path])
+        mismatches = compare(reference, lambda path: run_parse(args.candidate, mode_args + extra + ["--source=" + path]), files)
+        report(mismatches, name)
+        print(f"{name}: {len(files) - len(mismatches)}/{len(files)} same")
+        failed = failed or bool(mismatches)
+
+    if args.random:
+        if args.reference is None:
+            print("Random programs need --reference", file=sys.stderr)
+            sys.exit(2)
+        if not accepts(args.reference, random_args):
+            print(f"Reference does not accept {args.random_args}", file=sys.stderr)
+            sys.exit(2)
+        programs = sol25_gen.generate(args.seed, args.random)
+        mismatches = compare(lambda source: run_parse(args.reference, random_args, source),
+                             lambda source: run_parse(args.candidate, random_args + extra, source), programs)
+        report(mismatches, "random")
+        print(f"random: {len(programs) - len(mismatches)}/{len(programs)} same")
+        failed = failed or bool(mismatches)
+
+    sys.exit(1 if failed else 0)
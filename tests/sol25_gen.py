@@ -0,0 +1,101 @@
+import random
+
+# Random SOL25 programs for differential testing
+# methods only call methods defined after them and loops are short, so every program terminates
+
+INT_SELECTORS = ["plus:", "minus:", "multiplyBy:", "divBy:", "equalTo:", "greaterThan:"]
+UNARY_SELECTORS = ["asString", "asInteger", "isNil", "isNumber", "isString", "isBlock", "not", "print", "value", "new"]
+STRING_PIECES = ["a", "b", "text", " ", "\\'", "\\n", "\\\\", "&", "<", ">", "&apos;"]
+CLASS_PARENTS = ["Object", "Integer", "String", "Main"]
+
+
+class Sol25_generator:
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+
+    def program(self):
+        class_count = self.rng.randint(0, 2)
+        classes = ["Main"] + ["C" + str(index) for index in range(class_count)]
+        lines = []
+        if self.rng.random() < 0.3:
+            lines.append('"random program"')
+        for name in classes:
+            lines.extend(self.class_def(name, classes))
+        return "\n".join(lines) + "\n"
+
+    def class_def(self, name, classes):
+        parent = "Object" if name == "Main" else self.rng.choice(CLASS_PARENTS)
+        self.classes = classes
+        # selector -> number of params, run first, then methods callable from earlier ones
+        self.methods = []
+        if name == "Main":
+            self.methods.append(("run", 0))
+        for index in range(self.rng.randint(0 if name == "Main" else 1, 2)):
+            arity = self.rng.randint(0, 2)
+            selector = "m" + str(index) if arity == 0 else "".join("k" + str(index) + chr(ord("a") + param) + ":" for param in range(arity))
+            self.methods.append((selector, arity))
+
+        lines = ["class " + name + " : " + parent + " {"]
+        for position, (selector, arity) in enumerate(self.methods):
+            params = ["p" + str(param) for param in range(arity)]
+            self.callable = self.methods[position + 1:]
+            lines.append("  " + selector + " [" + "".join(":" + param + " " for param in params) + "|")
+            for stmt in self.block_body(list(params), depth=0):
+                lines.append("    " + stmt)
+            lines.append("  ]")
+        lines.append("}")
+        return lines
+
+    def block_body(self, names, depth):
+        stmts = []
+        for index in range(self.rng.randint(0, 4)):
+            var = "v" + str(depth) + str(index)
+            stmts.append(var + " := " + self.expr(names, depth) + ".")
+            names.append(var)
+        return stmts
+
+    def atom(self, names):
+        choice = self.rng.random()
+        if choice < 0.35 and names:
+            return self.rng.choice(names)
+        if choice < 0.65:
+            return str(self.rng.randint(-5, 20))
+        if choice < 0.85:
+            return "'" + "".join(self.rng.choice(STRING_PIECES) for _ in range(self.rng.randint(0, 4))) + "'"
+        if choice < 0.97:
+            return self.rng.choice(["nil", "true", "false", "self"])
+        # rarely an undefined var to reach the error paths
+        return "undefined"
+
+    def block(self, names, depth):
+        params = ["b" + str(depth) + str(param) for param in range(self.rng.randint(0, 1))]
+        body = self.block_body(names + params, depth + 1)
+        return "[" + "".join(":" + param + " " for param in params) + "| " + " ".join(body) + "]"
+
+    def expr(self, names, depth):
+        choice = self.rng.random()
+        if choice < 0.2:
+            return self.atom(names)
+        if choice < 0.35:
+            return self.atom(names) + " " + self.rng.choice(UNARY_SELECTORS)
+        if choice < 0.55:
+            return self.atom(names) + " " + self.rng.choice(INT_SELECTORS) + " " + self.atom(names)
+        if choice < 0.65:
+            return self.rng.choice(self.classes + ["String", "Integer"]) + " new"
+        if choice < 0.72:
+            return self.rng.choice(["Integer from: " + str(self.rng.randint(0, 9)), "String from: 'x'"])
+        if choice < 0.82 and self.callable:
+            selector, arity = self.rng.choice(self.callable)
+            if arity == 0:
+                return "self " + selector
+            return "self " + " ".join(part + ": " + self.atom(names) for part in selector[:-1].split(":"))
+        if choice < 0.9 and depth < 2:
+            return self.block(names, depth)
+        if choice < 0.95 and depth < 2:
+            return str(self.rng.randint(0, 3)) + " timesRepeat: " + self.block(names, depth)
+        return "(" + self.atom(names) + " " + self.rng.choice(INT_SELECTORS) + " " + self.atom(names) + ")"
+
+
+def generate(seed, count):
+    generator = Sol25_generator(seed)
+    return [generator.program() for _ in range(count)]
@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+import differential
+import sol25_gen
+
+# Random programs run through the reference and the new mode, both have to give the same result
+
+SEED = 2025
+PROGRAMS = sol25_gen.generate(SEED, 80)
+
+
+def accepted(source):
+    try:
+        differential.analyze(source)
+    except Exception:
+        return False
+    return True
+
+
+ACCEPTED = [source for source in PROGRAMS if accepted(source)]
+
+
+def corpus_sources():
+    sources = []
+    for name in ["valid", "invalid", "run"]:
+        for path in differential.corpus_files(name):
+            with open(path) as file:
+                sources.append(file.read())
+    return sources
+
+
+# corpus has the cases the generator does not make, e.g. cyclic inheritance or deep nesting
+XML_SOURCES = PROGRAMS + corpus_sources()
+
+
+@pytest.mark.parametrize("index", range(len(XML_SOURCES)))
+def test_types_keep_xml(index, tmp_path):
+    # --types only writes the sidecar index, the XML and exit code stay as they were
+    source = XML_SOURCES[index]
+    expected = differential.run_parse(differential.PARSE, [], source)
+    assert differential.run_parse(differential.PARSE, ["--types=" + str(tmp_path / "types.xml")], source) == expected
+
+
+@pytest.mark.parametrize("index", range(len(ACCEPTED)))
+def test_bound_sends_match_inline_caches(index):
+    # sends bound from the inference have to behave like sends going through the inline caches
+    tree, visitor = differential.analyze(ACCEPTED[index])
+    assert differential.execute(tree, visitor, bind=True) == differential.execute(tree, visitor, bind=False)
+
+
+@pytest.mark.skipif("SOL25_REFERENCE" not in os.environ, reason="SOL25_REFERENCE with reference parse.py is not set")
+@pytest.mark.parametrize("index", range(len(PROGRAMS)))
+def test_reference_xml(index):
+    source = PROGRAMS[index]
+    assert differential.run_parse(differential.PARSE, [], source) == differential.run_parse(os.environ["SOL25_REFERENCE"], [], source)
+
+
+def test_generator_is_deterministic():
+    assert sol25_gen.generate(SEED, 5) == PROGRAMS[:5]
+
+
+def test_accepts_known_arguments():
+    # corpora with arguments the reference does not know are skipped by the runner
+    assert differential.accepts(differential.PARSE, ["--run"])
+    assert not differential.accepts(differential.PARSE, ["--unknown"])
@@ -0,0 +1,56 @@
+import os
+import xml.etree.ElementTree as ET
+
+import pytest
+
+import differential
+
+# Output of parse.py has to stay the same byte for byte, golden files are in tests/corpus,
+# regenerate them with python3 tests/differential.py --write-golden only when the change is intended
+
+
+CASES = [
+    pytest.param(path, mode_args, id=name + "/" + os.path.basename(path))
+    for name, mode_args in differential.CORPORA.items()
+    for path in differential.corpus_files(name)
+]
+
+
+@pytest.mark.parametrize("path, mode_args", CASES)
+def test_golden(path, mode_args):
+    assert differential.run_parse(differential.PARSE, mode_args + ["--source=" + path]) == differential.read_golden(path)
+
+
+def test_corpus_covers_exit_codes():
+    codes = {differential.read_golden(path)[0] for name in differential.CORPORA for path in differential.corpus_files(name)}
+    assert {0, 21, 22, 31, 32, 33, 34, 35, 51, 52, 53, 99} <= codes
+
+
+def test_types_index_without_classes(tmp_path):
+    # cyclic inheritance cannot be defined, the index is written again with every send unknown
+    types_path = tmp_path / "types.xml"
+    types_path.write_text("stale")
+    path = os.path.join(differential.CORPUS_DIR, "valid", "cyclic_classes.sol25")
+    assert differential.run_parse(differential.PARSE, ["--types=" + str(types_path), "--source=" + path]) == differential.read_golden(path)
+    index = ET.parse(types_path).getroot()
+    assert (index.get("sends"), index.get("monomorphic")) == ("1", "0")
+    assert [send.get("classes") for send in index.iter("send")] == [None]
+
+
+def test_source_from_stdin():
+    path = os.path.join(differential.CORPUS_DIR, "valid", "string_escapes.sol25")
+    with open(path) as file:
+        source = file.read()
+    assert differential.run_parse(differential.PARSE, [], source) == differential.read_golden(path)
+
+
+def test_unknown_argument():
+    assert differential.run_parse(differential.PARSE, ["--unknown"])[0] == 10
+
+
+def test_help_with_other_arguments():
+    assert differential.run_parse(differential.PARSE, ["--help", "--source=x"])[0] == 10
+
+
+def test_missing_file():
+    assert differential.run_parse(differential.PARSE, ["--source=" + os.path.join(differential.CORPUS_DIR, "missing.sol25")])[0] == 11
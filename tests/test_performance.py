@@ -0,0 +1,103 @@
+import contextlib
+import gc
+import glob
+import io
+import json
+import os
+import time
+
+import pytest
+
+import differential
+
+# Timing budgets per corpus, time is divided by a fixed python workload so the budgets do not depend
+# on the machine, test fails when a corpus is slower than its budget by more than threshold.
+# SOL25_UPDATE_BUDGETS=1 python3 -m pytest tests/test_performance.py stores the current times.
+
+BUDGETS_PATH = os.path.join(differential.TESTS_DIR, "perf_budgets.json")
+REPEAT = 5
+# deep nesting is a correctness case, the visitor is quadratic in the nesting depth and it would take the whole valid budget
+UNTIMED = {"deep_nesting.sol25"}
+
+
+def calibrate():
+    table = {}
+    start = time.perf_counter()
+    for index in range(1000000):
+        table[index % 97] = table.get(index % 89, 0) + index
+    return time.perf_counter() - start
+
+
+def analyze_corpus(name, rounds):
+    sources = []
+    for path in differential.corpus_files(name):
+        if os.path.basename(path) in UNTIMED:
+            continue
+        with open(path) as file:
+            sources.append(file.read())
+
+    def measure():
+        for _ in range(rounds):
+            for source in sources:
+                try:
+                    tree, visitor = differential.analyze(source)
+                except Exception:
+                    continue
+                with contextlib.redirect_stdout(io.StringIO()):
+                    visitor.format_print_xml_tree()
+    return measure
+
+
+def run_corpus(paths, rounds):
+    programs = []
+    for path in paths:
+        with open(path) as file:
+            programs.append(differential.analyze(file.read()))
+
+    def measure():
+        for _ in range(rounds):
+            for tree, visitor in programs:
+                differential.execute(tree, visitor)
+    return measure
+
+
+CORPORA = {
+    "valid": lambda: analyze_corpus("valid", 20),
+    "invalid": lambda: analyze_corpus("invalid", 20),
+    "run": lambda: run_corpus(differential.corpus_files("run"), 10),
+    "benchmarks": lambda: run_corpus(sorted(glob.glob(os.path.join(differential.ROOT_DIR, "benchmarks", "*.sol25"))), 1),
+}
+
+
+def best_ratio(measure):
+    # calibration runs right before every measurement, the best pair is taken, garbage collector is off like in timeit
+    best = None
+    gc.disable()
+    try:
+        for _ in range(REPEAT):
+            calibration = calibrate()
+            start = time.perf_counter()
+            measure()
+            ratio = (time.perf_counter() - start) / calibration
+            best = ratio if best is None else min(best, ratio)
+    finally:
+        gc.enable()
+    return best
+
+
+@pytest.mark.parametrize("name", list(CORPORA))
+def test_budget(name):
+    measure = CORPORA[name]()
+    ratio = best_ratio(measure)
+
+    with open(BUDGETS_PATH) as file:
+        budgets = json.load(file)
+    if os.environ.get("SOL25_UPDATE_BUDGETS") == "1":
+        budgets["budgets"][name] = round(ratio, 2)
+        with open(BUDGETS_PATH, "w") as file:
+            json.dump(budgets, file, indent=2, sort_keys=True)
+            file.write("\n")
+        return
+
+    limit = budgets["budgets"][name] * (1 + budgets["threshold"])
+    assert ratio <= limit, f"{name} takes {ratio:.2f} calibration units, budget is {limit:.2f}"